@@ -1,40 +1,313 @@
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, request, render_template
 from flask_cors import CORS
 import socket
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import sqlite3
 from datetime import datetime
 import json
+import math
+import orjson
 import os
+import re
+import queue
+import atexit
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 
 app = Flask(__name__, template_folder='templates')
 CORS(app)
 
+def ojsonify(obj, status=200):
+    """Build a JSON response, serializing with orjson instead of jsonify"""
+    return app.response_class(orjson.dumps(obj), status=status, mimetype='application/json')
+
 # Database setup
 DATABASE = 'dns_lookup_history.db'
+# Per-process sizing follows the request threads of one gunicorn worker
+# (see gunicorn.conf.py): a connection for each, plus one for the writer
+REQUEST_THREADS = int(os.environ.get('GUNICORN_THREADS', 8))
+POOL_SIZE = REQUEST_THREADS + 1
+
+# Applied once to every connection when it is opened; WAL lets readers
+# proceed while a write is in progress
+CONNECTION_PRAGMAS = (
+    'PRAGMA busy_timeout=5000',
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA wal_autocheckpoint=1000',
+    'PRAGMA journal_size_limit=16777216',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA mmap_size=268435456',
+    'PRAGMA cache_size=-64000',
+)
+
+# Statements are kept identical across calls so each pooled connection's
+# statement cache only has to prepare them once
+INSERT_SQL = '''
+    INSERT INTO lookup_history
+    (domain, ip_address, country, city, region, isp, ttl)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+# lookup_time and id come last: together they are the keyset pagination
+# cursor, since lookup_time alone only has one-second precision
+HISTORY_COLUMNS = ('domain', 'ip_address', 'country', 'city', 'region', 'isp', 'ttl', 'lookup_time', 'id')
+MAX_HISTORY_LIMIT = 500
+
+# All history reads share one statement shape; only the selected columns and
+# the optional keyset condition differ. Continuing from the previous page's
+# next_before is ?before=<lookup_time>&before_id=<id>
+HISTORY_PAGE_SQL = '''
+    SELECT {columns}
+    FROM lookup_history
+    {where}
+    ORDER BY lookup_time DESC, id DESC
+    LIMIT ?
+'''
+HISTORY_BEFORE_WHERE = 'WHERE (lookup_time, id) < (?, ?)'
+
+# Row-object history: SQLite renders each entry as a JSON object, and
+# lookup_time and id are selected again as the pagination cursor
+HISTORY_JSON_COLUMNS = 'json_object({}), lookup_time, id'.format(
+    ', '.join(f"'{column}', {column}" for column in HISTORY_COLUMNS)
+)
+
+SELECT_HISTORY_SQL = HISTORY_PAGE_SQL.format(columns=', '.join(HISTORY_COLUMNS), where='')
+SELECT_HISTORY_BEFORE_SQL = HISTORY_PAGE_SQL.format(columns=', '.join(HISTORY_COLUMNS), where=HISTORY_BEFORE_WHERE)
+SELECT_HISTORY_JSON_SQL = HISTORY_PAGE_SQL.format(columns=HISTORY_JSON_COLUMNS, where='')
+SELECT_HISTORY_JSON_BEFORE_SQL = HISTORY_PAGE_SQL.format(columns=HISTORY_JSON_COLUMNS, where=HISTORY_BEFORE_WHERE)
+
+class ConnectionPool:
+    """Fixed-size pool of long-lived SQLite connections shared across requests"""
+
+    def __init__(self, database, size):
+        self._connections = queue.Queue(maxsize=size)
+        for _ in range(size):
+            self._connections.put(self._connect(database))
+
+    @staticmethod
+    def _connect(database):
+        conn = sqlite3.connect(database, check_same_thread=False, cached_statements=128)
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    @contextmanager
+    def acquire(self):
+        """Check out a connection and return it to the pool when done"""
+        conn = self._connections.get()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._connections.put(conn)
+
+pool = None
+writer_thread = None
+
+# History rows are written by a single background thread in batches of up
+# to WRITE_BATCH_SIZE rows, waiting at most WRITE_BATCH_WAIT seconds. The
+# queue is bounded so a stalled writer cannot grow it without limit; a
+# request waits at most WRITE_QUEUE_TIMEOUT seconds for room before its row
+# is dropped
+WRITE_QUEUE_MAXSIZE = 10000
+WRITE_QUEUE_TIMEOUT = 1
+write_queue = queue.Queue(maxsize=WRITE_QUEUE_MAXSIZE)
+WRITE_BATCH_SIZE = 500
+WRITE_BATCH_WAIT = 0.01
+
+# The writer checkpoints the WAL into the main database every N batches so
+# the checkpoint fsync never lands on a request thread. RESTART rewinds the
+# WAL instead of truncating it, so appends overwrite already-allocated
+# blocks rather than growing the file again; journal_size_limit caps it
+CHECKPOINT_EVERY_BATCHES = 100
+
+# A failed batch is retried this many times, sleeping WRITE_RETRY_BACKOFF
+# seconds and doubling each time, before its rows are dropped
+WRITE_RETRIES = 3
+WRITE_RETRY_BACKOFF = 0.5
 
 def init_db():
-    """Initialize the database with the lookup history table"""
-    conn = sqlite3.connect(DATABASE)
-    cursor = conn.cursor()
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS lookup_history (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            domain TEXT NOT NULL,
-            ip_address TEXT,
-            country TEXT,
-            city TEXT,
-            region TEXT,
-            isp TEXT,
-            ttl INTEGER,
-            lookup_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
-    conn.commit()
-    conn.close()
+    """Initialize the database with the lookup history table
+
+    Safe to call from many worker processes booting at once: the schema is
+    created inside BEGIN IMMEDIATE, so one worker does the work and the
+    others wait on the busy timeout and then find it already in place.
+    """
+    global pool, writer_thread
+    conn = sqlite3.connect(DATABASE, isolation_level=None)
+    try:
+        cursor = conn.cursor()
+        for pragma in CONNECTION_PRAGMAS:
+            cursor.execute(pragma)
+
+        # The index is created last, so its presence means the schema is complete
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_lookup_time_id'")
+        if cursor.fetchone() is None:
+            cursor.execute('BEGIN IMMEDIATE')
+            try:
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS lookup_history (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        domain TEXT NOT NULL,
+                        ip_address TEXT,
+                        country TEXT,
+                        city TEXT,
+                        region TEXT,
+                        isp TEXT,
+                        ttl INTEGER,
+                        lookup_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
+                # Scanned backwards, this serves ORDER BY lookup_time DESC,
+                # id DESC in get_history without a sort step. It replaces the
+                # older idx_lookup_time (lookup_time DESC), whose ascending
+                # rowids within each second could not.
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_lookup_time_id
+                    ON lookup_history(lookup_time, id)
+                ''')
+                cursor.execute('DROP INDEX IF EXISTS idx_lookup_time')
+                cursor.execute('COMMIT')
+            except Exception:
+                # Release the write lock so other workers are not left waiting;
+                # SQLite may already have rolled back on errors like SQLITE_FULL
+                if conn.in_transaction:
+                    cursor.execute('ROLLBACK')
+                raise
+    finally:
+        conn.close()
+
+    if pool is None:
+        pool = ConnectionPool(DATABASE, POOL_SIZE)
+
+    if writer_thread is None:
+        writer_thread = threading.Thread(target=history_writer, name='history-writer', daemon=True)
+        writer_thread.start()
+        atexit.register(stop_history_writer)
+
+class ExpiringCache:
+    """Thread-safe LRU cache whose entries expire after a per-entry TTL"""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached value, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+# Local MaxMind GeoLite2 databases; when the city database is present,
+# geolocation is answered from the memory-mapped file instead of ipapi.co
+GEOIP_CITY_DB = os.environ.get('GEOIP_CITY_DB', 'GeoLite2-City.mmdb')
+GEOIP_ASN_DB = os.environ.get('GEOIP_ASN_DB', 'GeoLite2-ASN.mmdb')
+
+def open_geo_database(path):
+    """Open a MaxMind database with mmap, or return None if unavailable"""
+    try:
+        import maxminddb
+    except ImportError:
+        return None
+    if not os.path.exists(path):
+        return None
+    return maxminddb.open_database(path, maxminddb.MODE_MMAP)
+
+geo_city_reader = open_geo_database(GEOIP_CITY_DB)
+geo_asn_reader = open_geo_database(GEOIP_ASN_DB)
+
+# Shared HTTP session so sockets and TLS sessions to ipapi.co are reused
+session = requests.Session()
+session.mount('https://', HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=64,
+    max_retries=Retry(total=2, backoff_factor=0.1)
+))
+
+class SingleFlight:
+    """Collapse concurrent calls for the same key into a single execution"""
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func, *args):
+        """Run func(*args), or wait for the in-flight call with the same key"""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = func(*args)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+# Concurrent cache misses for the same domain or IP share one upstream lookup
+dns_flight = SingleFlight()
+geo_flight = SingleFlight()
+
+# IP -> geolocation mapping changes rarely, so repeat lookups skip ipapi.co
+GEO_CACHE_TTL = 600
+geo_cache = ExpiringCache(maxsize=10000)
+
+# Last IP each domain resolved to, used to start geolocation before DNS returns
+LAST_IP_TTL = 86400
+last_ip_by_domain = ExpiringCache(maxsize=10000)
+lookup_executor = ThreadPoolExecutor(max_workers=REQUEST_THREADS, thread_name_prefix='geo-prefetch')
+
+# Resolved A records per domain as (ip_address, ttl, expires_at), each kept
+# for its own record TTL
+dns_cache = ExpiringCache(maxsize=1000)
 
 def get_dns_info(domain):
     """Get DNS information for a domain"""
+    cached = dns_cache.get(domain)
+    if cached is not None:
+        ip_address, ttl, expires_at = cached
+        # Report the time left on the record, as a caching resolver would
+        return {
+            'ip_address': ip_address,
+            'ttl': max(1, math.ceil(expires_at - time.monotonic())),
+            'error': None
+        }
+    return dns_flight.do(domain, resolve_dns_info, domain)
+
+def resolve_dns_info(domain):
+    """Query the resolver for a domain and cache a successful answer"""
     try:
         # Try using dnspython first for TTL info
         try:
@@ -42,19 +315,10 @@ def get_dns_info(domain):
             result = dns.resolver.resolve(domain, 'A')
             ip_address = str(result[0])
             ttl = result.ttl
-            return {
-                'ip_address': ip_address,
-                'ttl': ttl,
-                'error': None
-            }
         except ImportError:
             # Fallback to socket if dnspython not available
             ip_address = socket.gethostbyname(domain)
-            return {
-                'ip_address': ip_address,
-                'ttl': 300,  # Default TTL when dnspython not available
-                'error': None
-            }
+            ttl = 300  # Default TTL when dnspython not available
     except Exception as e:
         return {
             'ip_address': None,
@@ -62,21 +326,65 @@ def get_dns_info(domain):
             'error': str(e)
         }
 
+    # Honour the record TTL so cached answers expire with the authoritative one
+    if ttl > 0:
+        dns_cache.set(domain, (ip_address, ttl, time.monotonic() + ttl), ttl)
+    return {
+        'ip_address': ip_address,
+        'ttl': ttl,
+        'error': None
+    }
+
+def get_local_geo_info(ip_address):
+    """Get geographical information for an IP address from the GeoLite2 files"""
+    try:
+        city = geo_city_reader.get(ip_address) or {}
+        asn = (geo_asn_reader.get(ip_address) if geo_asn_reader else None) or {}
+    except Exception as e:
+        return {
+            'country': 'Unknown',
+            'city': 'Unknown',
+            'region': 'Unknown',
+            'isp': 'Unknown',
+            'error': str(e)
+        }
+
+    subdivisions = city.get('subdivisions') or [{}]
+    return {
+        'country': city.get('country', {}).get('names', {}).get('en', 'Unknown'),
+        'city': city.get('city', {}).get('names', {}).get('en', 'Unknown'),
+        'region': subdivisions[0].get('names', {}).get('en', 'Unknown'),
+        'isp': asn.get('autonomous_system_organization', 'Unknown'),
+        'error': None
+    }
+
 def get_geo_info(ip_address):
     """Get geographical information for an IP address"""
+    if geo_city_reader is not None:
+        return get_local_geo_info(ip_address)
+
+    cached = geo_cache.get(ip_address)
+    if cached is not None:
+        return cached
+    return geo_flight.do(ip_address, fetch_geo_info, ip_address)
+
+def fetch_geo_info(ip_address):
+    """Query ipapi.co for an IP address and cache a successful answer"""
     try:
         # Using ipapi.co for geolocation (free tier)
-        response = requests.get(f'https://ipapi.co/{ip_address}/json/', timeout=10)
+        response = session.get(f'https://ipapi.co/{ip_address}/json/', timeout=10)
         
         if response.status_code == 200:
             data = response.json()
-            return {
+            geo_info = {
                 'country': data.get('country_name', 'Unknown'),
                 'city': data.get('city', 'Unknown'),
                 'region': data.get('region', 'Unknown'),
                 'isp': data.get('org', 'Unknown'),
                 'error': None
             }
+            geo_cache.set(ip_address, geo_info, GEO_CACHE_TTL)
+            return geo_info
         else:
             return {
                 'country': 'Unknown',
@@ -94,16 +402,43 @@ def get_geo_info(ip_address):
             'error': str(e)
         }
 
+# Optional protocol followed by the host part of a URL-ish user input
+DOMAIN_RE = re.compile(r'^(?:https?://)?([^/?#]*)', re.IGNORECASE)
+
+def clean_domain(value):
+    """Normalize user input to a bare lowercase host, removing protocol and path"""
+    return DOMAIN_RE.match(value.strip().lower()).group(1)
+
+def lookup_domain(domain):
+    """Resolve a domain and geolocate its IP, overlapping the two when possible
+
+    If the domain was seen before and its previous IP is not in the geo
+    cache, that IP is geolocated via ipapi.co in parallel with the DNS
+    query. The result is used when the domain still resolves to the same
+    address. With a local GeoLite2 database there is nothing to overlap.
+    """
+    previous_ip = last_ip_by_domain.get(domain)
+    prefetch = None
+    if (previous_ip is not None and geo_city_reader is None
+            and geo_cache.get(previous_ip) is None):
+        prefetch = lookup_executor.submit(get_geo_info, previous_ip)
+
+    dns_info = get_dns_info(domain)
+    if dns_info['error']:
+        return dns_info, None
+
+    ip_address = dns_info['ip_address']
+    last_ip_by_domain.set(domain, ip_address, LAST_IP_TTL)
+    if prefetch is not None and ip_address == previous_ip:
+        geo_info = prefetch.result()
+    else:
+        geo_info = get_geo_info(ip_address)
+    return dns_info, geo_info
+
 def save_lookup_history(domain, dns_info, geo_info):
-    """Save lookup result to database"""
+    """Queue a lookup result for the background history writer"""
     try:
-        conn = sqlite3.connect(DATABASE)
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO lookup_history 
-            (domain, ip_address, country, city, region, isp, ttl)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (
+        write_queue.put((
             domain,
             dns_info.get('ip_address'),
             geo_info.get('country'),
@@ -111,43 +446,100 @@ def save_lookup_history(domain, dns_info, geo_info):
             geo_info.get('region'),
             geo_info.get('isp'),
             dns_info.get('ttl')
-        ))
-        conn.commit()
-        conn.close()
+        ), timeout=WRITE_QUEUE_TIMEOUT)
         return True
-    except Exception as e:
-        print(f"Error saving to database: {e}")
+    except queue.Full:
+        print("Error saving to database: history write queue is full")
         return False
 
+def history_writer():
+    """Drain queued history rows and insert them in batched transactions
+
+    A None item is the shutdown sentinel from stop_history_writer: the rows
+    collected so far are written and the thread exits.
+    """
+    batches = 0
+    stopping = False
+    while not stopping:
+        rows = []
+        item = write_queue.get()
+        deadline = time.monotonic() + WRITE_BATCH_WAIT
+        while True:
+            if item is None:
+                stopping = True
+                break
+            rows.append(item)
+            remaining = deadline - time.monotonic()
+            if len(rows) >= WRITE_BATCH_SIZE or remaining <= 0:
+                break
+            try:
+                item = write_queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+
+        if not rows:
+            continue
+
+        if not write_history_batch(rows):
+            continue
+
+        batches += 1
+        if batches % CHECKPOINT_EVERY_BATCHES == 0:
+            try:
+                with pool.acquire() as conn:
+                    conn.execute('PRAGMA wal_checkpoint(RESTART)')
+            except Exception as e:
+                print(f"Error checkpointing database: {e}")
+
+def write_history_batch(rows):
+    """Insert a batch of history rows, retrying with backoff on errors
+
+    Other workers' writers and checkpoints contend for the same write lock,
+    so a busy database is retried rather than dropping the whole batch.
+    """
+    for attempt in range(WRITE_RETRIES + 1):
+        try:
+            with pool.acquire() as conn:
+                conn.execute('BEGIN IMMEDIATE')
+                conn.executemany(INSERT_SQL, rows)
+                conn.commit()
+            return True
+        except Exception as e:
+            if attempt == WRITE_RETRIES:
+                print(f"Error saving to database: {e}; dropped {len(rows)} rows")
+                return False
+            print(f"Error saving to database: {e}; retrying {len(rows)} rows")
+            time.sleep(WRITE_RETRY_BACKOFF * 2 ** attempt)
+
+def stop_history_writer():
+    """Flush queued history rows and stop the writer thread at process exit"""
+    if writer_thread is not None and writer_thread.is_alive():
+        write_queue.put(None)
+        writer_thread.join(timeout=10)
+
 @app.route('/')
 def index():
     """Serve the main HTML page"""
-    return render_template('index.html')
+    return render_template('Index.html')
 
 @app.route('/api/lookup', methods=['POST'])
 def dns_lookup():
     """API endpoint for DNS lookup"""
     try:
         data = request.get_json()
-        domain = data.get('domain', '').strip().lower()
+        domain = clean_domain(data.get('domain', ''))
         
         if not domain:
-            return jsonify({'error': 'Domain name is required'}), 400
-        
-        # Remove protocol if present
-        domain = domain.replace('http://', '').replace('https://', '').split('/')[0]
+            return ojsonify({'error': 'Domain name is required'}, 400)
         
-        # Get DNS information
-        dns_info = get_dns_info(domain)
+        # Get DNS and geolocation information
+        dns_info, geo_info = lookup_domain(domain)
         
         if dns_info['error']:
-            return jsonify({
+            return ojsonify({
                 'error': f'DNS lookup failed: {dns_info["error"]}',
                 'domain': domain
-            }), 400
-        
-        # Get geolocation information
-        geo_info = get_geo_info(dns_info['ip_address'])
+            }, 400)
         
         # Prepare response
         result = {
@@ -164,65 +556,68 @@ def dns_lookup():
         # Save to database
         save_lookup_history(domain, dns_info, geo_info)
         
-        return jsonify(result)
+        return ojsonify(result)
         
     except Exception as e:
-        return jsonify({'error': f'Server error: {str(e)}'}), 500
+        return ojsonify({'error': f'Server error: {str(e)}'}, 500)
 
 @app.route('/api/history', methods=['GET'])
 def get_history():
     """API endpoint to get lookup history"""
     try:
         limit = request.args.get('limit', 50, type=int)
+        if not 0 <= limit <= MAX_HISTORY_LIMIT:
+            return ojsonify({'error': f'limit must be between 0 and {MAX_HISTORY_LIMIT}'}, 400)
+        before = request.args.get('before')
+        # Without before_id, before alone means "strictly older than this time"
+        before_id = request.args.get('before_id', 0, type=int)
         
-        conn = sqlite3.connect(DATABASE)
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT domain, ip_address, country, city, region, isp, ttl, lookup_time
-            FROM lookup_history
-            ORDER BY lookup_time DESC
-            LIMIT ?
-        ''', (limit,))
+        # ?format=columns sends column names once and each row as an array
+        columnar = request.args.get('format') == 'columns'
+        if columnar:
+            sql = SELECT_HISTORY_BEFORE_SQL if before else SELECT_HISTORY_SQL
+        else:
+            sql = SELECT_HISTORY_JSON_BEFORE_SQL if before else SELECT_HISTORY_JSON_SQL
+        params = (before, before_id, limit) if before else (limit,)
         
-        rows = cursor.fetchall()
-        conn.close()
+        with pool.acquire() as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            
+            rows = cursor.fetchall()
+        
+        # Cursor for the next page, present only when this page is full
+        next_before = None
+        if rows and len(rows) == limit:
+            lookup_time, row_id = rows[-1][-2:]
+            next_before = {'lookup_time': lookup_time, 'id': row_id}
         
-        history = []
-        for row in rows:
-            history.append({
-                'domain': row[0],
-                'ip_address': row[1],
-                'country': row[2],
-                'city': row[3],
-                'region': row[4],
-                'isp': row[5],
-                'ttl': row[6],
-                'lookup_time': row[7]
-            })
+        if columnar:
+            return ojsonify({'columns': HISTORY_COLUMNS, 'rows': rows, 'next_before': next_before})
         
-        return jsonify({'history': history})
+        body = (
+            '{"history":[' + ','.join(row[0] for row in rows) + '],'
+            '"next_before":' + orjson.dumps(next_before).decode() + '}'
+        )
+        return app.response_class(body, mimetype='application/json')
         
     except Exception as e:
-        return jsonify({'error': f'Failed to retrieve history: {str(e)}'}), 500
+        return ojsonify({'error': f'Failed to retrieve history: {str(e)}'}, 500)
 
 @app.route('/api/domain/<domain_name>')
 def get_domain_info(domain_name):
     """API endpoint to get domain info in JSON format"""
     try:
-        domain = domain_name.strip().lower()
-        domain = domain.replace('http://', '').replace('https://', '').split('/')[0]
+        domain = clean_domain(domain_name)
         
-        # Get DNS information
-        dns_info = get_dns_info(domain)
+        # Get DNS and geolocation information
+        dns_info, geo_info = lookup_domain(domain)
         
         if dns_info['error']:
-            return jsonify({
+            return ojsonify({
                 'error': f'DNS lookup failed: {dns_info["error"]}',
                 'domain': domain
-            }), 400
-        
-        # Get geolocation information
-        geo_info = get_geo_info(dns_info['ip_address'])
+            }, 400)
         
         # Prepare response
         result = {
@@ -241,21 +636,19 @@ def get_domain_info(domain_name):
         # Save to database
         save_lookup_history(domain, dns_info, geo_info)
         
-        return jsonify(result)
+        return ojsonify(result)
         
     except Exception as e:
-        return jsonify({'error': f'Server error: {str(e)}'}), 500
+        return ojsonify({'error': f'Server error: {str(e)}'}, 500)
+
+# Initialize database; runs once in every worker process that imports the
+# app, since the pool and writer thread cannot be shared across a fork
+init_db()
 
 if __name__ == '__main__':
-    # Create templates directory if it doesn't exist
-    os.makedirs('templates', exist_ok=True)
-    
-    # Initialize database
-    init_db()
-    
-    # Run the app
+    # Run the development server; use gunicorn (see gunicorn.conf.py) in production
     port = int(os.environ.get('PORT', 5000))
 
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    app.run(host='0.0.0.0', port=port)
 
 
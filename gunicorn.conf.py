@@ -0,0 +1,12 @@
+import multiprocessing
+import os
+
+# Start with: gunicorn app:app
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2))
+
+# Threaded workers so a request blocked on DNS or ipapi.co does not hold up
+# the rest of the worker
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', 8))
+timeout = 30